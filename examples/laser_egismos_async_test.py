@@ -24,12 +24,14 @@ async def counter():
 
 async def reader():
     await asyncio.sleep(0.5)
-    uart = busio.UART(board.D2, board.D1, baudrate=9600)
+    uart = busio.UART(board.D2, board.D1, baudrate=9600, receiver_buffer_size=64)
     laser = AsyncLaser(uart)
     await laser.set_buzzer(False)
     for _ in range(5):
         distance = await laser.measure()
         print(f"distance: {distance}")
+    for distance in await laser.measure_many(5):
+        print(f"continuous distance: {distance}")
 
 
 async def main():
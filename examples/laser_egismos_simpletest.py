@@ -21,12 +21,10 @@ periph_power.switch_to_output(True)
 print("laser power enable")
 laser_power.switch_to_output(True)
 time.sleep(0.1)
-uart = busio.UART(board.D2, board.D1, baudrate=9600)
+uart = busio.UART(board.D2, board.D1, baudrate=9600, receiver_buffer_size=64)
 print("start talking")
 laser = Laser(uart)
 laser.set_buzzer(False)
-laser.set_laser(True)
-time.sleep(1)
-laser.set_laser(False)
-time.sleep(0.1)
 print(f"Distance is {laser.distance}cm")
+for distance in laser.measure_continuous(5):
+    print(f"Distance is {distance / 10.0}cm")
@@ -30,13 +30,18 @@ __repo__ = "https://github.com/furbrain/CircuitPython_laser_egismos.git"
 import time
 
 try:
-    from typing import Sequence, Tuple
+    from typing import Iterator, List, Sequence, Tuple
 except ImportError:
     pass
 
 import busio
 
 DEFAULT_TIMEOUT = 5.0
+FRAME_END = 0xA8
+FRAME_START = 0xAA
+_FRAME_END_BYTES = b"\xa8"
+_FRAME_START_BYTES = b"\xaa"
+UART_TIMEOUT = 0.05
 
 
 class LaserError(RuntimeError):
@@ -77,8 +82,8 @@ class LaserTimeOutError(LaserError):
 
 class _LaserBase:
     # pylint: disable=too-few-public-methods
-    FRAME_END = 0xA8
-    FRAME_START = 0xAA
+    FRAME_END = FRAME_END
+    FRAME_START = FRAME_START
     BUZZER_CONTROL = 0x47
     STOP_CONTINUOUS_MEASURE = 0x46
     CONTINUOUS_MEASURE = 0x45
@@ -90,12 +95,32 @@ class _LaserBase:
     READ_SLAVE_ADDRESS = 0x04
     READ_DEV_TYPE = 0x02
     READ_SW_VERSION = 0x01
+    _MIN_REPLY_LENGTH = 6  # start, address, command, one data byte, checksum, end
+    # commands that are only acknowledged, so have a reply of known length
+    _REPLY_LEN = {
+        LASER_ON: 6,
+        LASER_OFF: 6,
+        BUZZER_CONTROL: 6,
+        STOP_CONTINUOUS_MEASURE: 6,
+        SET_SLAVE_ADDRESS: 6,
+    }
+    # error replies to a measurement, with the exception each should raise
+    _ERR_MAP = {
+        b"ERR256": (TooBrightError, "Too much ambient light, or laser too close"),
+        b"ERR255": (
+            TooDimError,
+            "Laser spot too dim. Use reflective tape or shorter distance",
+        ),
+        b"ERR204": (BadReadingError, "Unable to measure - is the target moving?"),
+    }
 
     def __init__(self, uart: busio.UART, address=0x01, timeout=DEFAULT_TIMEOUT):
         """
         Access an Egismos Laser distance module v2
 
-        :param ~busio.UART uart: uart to use to connect. Should have baud rate set to 9600
+        :param ~busio.UART uart: uart to use to connect. Should have baud rate set to 9600,
+          and a receive buffer large enough to hold a whole reply, e.g.
+          ``busio.UART(tx, rx, baudrate=9600, receiver_buffer_size=64)``
         :param address: address to use, default is 0x01; you should only change this if
           using multiple devices
         :param timeout: timeout to wait for a response from the device
@@ -103,6 +128,42 @@ class _LaserBase:
         self.uart: busio.UART = uart
         self.address: int = address
         self.timeout: float = timeout
+        self._pending = b""  # bytes received after the end of the last frame
+        self._rx_buf = bytearray(32)  # reused for every frame received
+        self._rx_len = 0
+        self._build_frame_cache()
+
+    def _build_frame_cache(self):
+        """
+        Precompute the frames for commands that never carry any data, so they do not
+        need to be rebuilt every time they are sent
+        """
+        self._frame_cache_address = self.address
+        self._frame_cache = {
+            command: self._build_frame(command)
+            for command in (
+                self.LASER_ON,
+                self.LASER_OFF,
+                self.SINGLE_MEASURE,
+                self.CONTINUOUS_MEASURE,
+                self.STOP_CONTINUOUS_MEASURE,
+            )
+        }
+
+    def _get_frame(
+        self, command: int, address=None, data: Sequence[int] = None
+    ) -> bytes:
+        """
+        Get the frame for the given command, using a precomputed one if available.
+        Parameters are the same as for `_build_frame`
+        """
+        if address is None and data is None:
+            if self._frame_cache_address != self.address:
+                self._build_frame_cache()
+            frame = self._frame_cache.get(command)
+            if frame is not None:
+                return frame
+        return self._build_frame(command, address, data)
 
     def _build_frame(
         self, command: int, address=None, data: Sequence[int] = None
@@ -118,35 +179,99 @@ class _LaserBase:
         if address is None:
             address = self.address
         if data is None:
-            data = []
-        if isinstance(data, int):
-            data = [data]
-        checksum = (command + address + sum(data)) & 0x7F
-        frame = [self.FRAME_START, address, command] + data + [checksum, self.FRAME_END]
+            data = b""
+        elif isinstance(data, int):
+            data = (data,)
+        frame = bytearray(len(data) + 5)
+        frame[0] = FRAME_START
+        frame[1] = address
+        frame[2] = command
+        checksum = command + address
+        for i, byte in enumerate(data):
+            frame[i + 3] = byte
+            checksum += byte
+        frame[-2] = checksum & 0x7F
+        frame[-1] = FRAME_END
         return bytes(frame)
 
-    def _parse_frame(self, frame: bytes) -> Tuple[int, int, bytes]:
+    def _write_frame(self, frame: bytes):
+        # clear any stale input before writing, but only if there is some
+        self._pending = b""
+        if self.uart.in_waiting:
+            self.uart.reset_input_buffer()
+        self.uart.write(frame)
+
+    def _add_to_frame(self, chunk: bytes) -> bool:
+        """
+        Add received bytes to the frame being assembled in the receive buffer. Bytes
+        before FRAME_START are discarded, and any after FRAME_END are kept back to start
+        the next frame. A partial frame too long for the buffer is discarded, and the
+        search for FRAME_START starts again
+
+        :param bytes chunk: bytes received
+        :return: ``True`` if the frame is now complete
+        """
+        length = self._rx_len
+        while True:
+            start = 0
+            if not length:
+                start = chunk.find(_FRAME_START_BYTES)
+                if start < 0:
+                    return False
+            # don't look for FRAME_END in the start or address bytes
+            end = chunk.find(_FRAME_END_BYTES, start + max(0, 2 - length))
+            stop = len(chunk) if end < 0 else end + 1
+            new_length = length + stop - start
+            if new_length <= len(self._rx_buf):
+                break
+            # too long for a real frame, so FRAME_START was probably line noise:
+            # drop the partial frame and look for another start
+            if not length:
+                chunk = chunk[start + 1 :]
+            length = self._rx_len = 0
+        self._rx_buf[length:new_length] = chunk[start:stop]
+        self._rx_len = new_length
+        if end < 0:
+            return False
+        self._pending = chunk[stop:]
+        return True
+
+    def _start_frame(self) -> bytes:
+        """
+        Empty the receive buffer ready for a new frame
+
+        :return: any bytes already received for the new frame
+        """
+        self._rx_len = 0
+        chunk = self._pending
+        self._pending = b""
+        return chunk
+
+    @staticmethod
+    def _parse_frame(frame: memoryview) -> Tuple[int, int, memoryview]:
         """
         Parse a frame and return the contained data. Raises a value error if incorrect
         start or end bytes, or if the checksum is incorrect
-        :param bytes frame: The frame to be parsed
+        :param memoryview frame: The frame to be parsed, may also be `bytes`
         :return: a tuple containing the command
         :raises: `ValueError` if an error is encountered
         """
-        if frame[0] != self.FRAME_START:
-            raise LaserCommandFailedError(
-                f"Frame does not start with {self.FRAME_START}"
-            )
-        if frame[-1] != self.FRAME_END:
-            raise LaserCommandFailedError(f"Frame does not end with {self.FRAME_END}")
-        checksum = sum(frame[1:-2]) & 0x7F
+        if frame[0] != FRAME_START:
+            raise LaserCommandFailedError("Frame does not start with 0xAA")
+        if frame[-1] != FRAME_END:
+            raise LaserCommandFailedError("Frame does not end with 0xA8")
+        # sum in place rather than slicing the frame
+        checksum = 0
+        for i in range(1, len(frame) - 2):
+            checksum += frame[i]
+        checksum &= 0x7F
         if frame[-2] != checksum:
             raise LaserCommandFailedError(
                 f"Checksum should be {checksum}, was {frame[-2]}"
             )
         command = frame[2]
         address = frame[1]
-        data = frame[3:-2]
+        data = memoryview(frame)[3:-2]
         return command, address, data
 
     def _process_frame(self, address, command, frame):
@@ -156,30 +281,32 @@ class _LaserBase:
         if command != read_command:
             raise LaserCommandFailedError(
                 f"Received command {read_command} does not match"
-                + f" sent command {command}"
+                f" sent command {command}"
             )
         if address != read_address:
             raise LaserCommandFailedError(
                 f"Received address {read_address} does not match"
-                + f" sent address {address}"
+                f" sent address {address}"
             )
         return read_data
 
-    @staticmethod
-    def _check_measurement_for_errors(result):
-        if result == b"ERR256":
-            raise TooBrightError("Too much ambient light, or laser too close")
-        if result == b"ERR255":
-            raise TooDimError(
-                "Laser spot too dim. Use reflective tape or shorter distance"
-            )
-        if result == b"ERR204":
-            raise BadReadingError("Unable to measure - is the target moving?")
-        try:
-            result = int(result)
-        except ValueError as exc:
-            raise LaserCommandFailedError("Unexpected response from read") from exc
-        return result
+    @classmethod
+    def _check_measurement_for_errors(cls, result: memoryview):
+        # only copy the result to look it up if it could be an error code
+        if result and result[0] == 0x45:  # "E"
+            error = cls._ERR_MAP.get(bytes(result))
+            if error:
+                raise error[0](error[1])
+        # reply is ASCII digits, so convert by hand rather than with int()
+        if not result:
+            raise LaserCommandFailedError("Unexpected response from read")
+        distance = 0
+        for byte in result:
+            digit = byte - 0x30
+            if digit < 0 or digit > 9:
+                raise LaserCommandFailedError("Unexpected response from read")
+            distance = distance * 10 + digit
+        return distance
 
 
 class Laser(_LaserBase):
@@ -187,27 +314,68 @@ class Laser(_LaserBase):
     This is a driver for the Laser Module 2, produced by Egismos
     """
 
-    def _read_frame(self):
-        # wait for an AA to start
-        timeout_due = time.monotonic() + self.timeout
-        buffer = b"\x00"
-        while buffer[0] != self.FRAME_START:
-            buffer = self.uart.read(1) or b"\x00"
-            if time.monotonic() > timeout_due:
+    def __init__(self, uart: busio.UART, address=0x01, timeout=DEFAULT_TIMEOUT):
+        # keep individual reads short, overall timeout is handled by `_read_frame`
+        uart.timeout = min(uart.timeout, UART_TIMEOUT)
+        super().__init__(uart, address, timeout)
+
+    def _read_frame(self, length: int = None, timeout_due: float = None) -> memoryview:
+        """
+        Read a frame from the laser
+
+        :param int length: length of the whole frame if known in advance, in which
+          case it is requested in one read, rather than polling for more data. If the
+          frame turns out to be longer, the rest is polled for as usual
+        :param float timeout_due: value of `time.monotonic` at which to give up,
+          default is `timeout` from now
+        :return: the frame, only valid until the next frame is read
+        """
+        uart = self.uart
+        read = uart.read
+        monotonic = time.monotonic
+        add_to_frame = self._add_to_frame
+        if timeout_due is None:
+            timeout_due = monotonic() + self.timeout
+        chunk = self._start_frame()
+        while not add_to_frame(chunk):
+            if monotonic() > timeout_due:
+                if self._rx_len:
+                    raise LaserTimeOutError("Timed Out waiting for FRAME_END")
                 raise LaserTimeOutError("Timed Out waiting for FRAME_START")
-        while buffer[-1] != self.FRAME_END:
-            buffer += self.uart.read(1) or b""
-            if time.monotonic() > timeout_due:
-                raise LaserTimeOutError("Timed Out waiting for FRAME_END")
-        return buffer
+            if not self._rx_len:
+                # take everything waiting, FRAME_START is found within it
+                chunk = read(uart.in_waiting or length or 1) or b""
+            elif length and self._rx_len < length:
+                chunk = read(length - self._rx_len) or b""
+            else:
+                waiting = uart.in_waiting
+                if waiting:
+                    chunk = read(waiting) or b""
+                else:
+                    chunk = b""
+                    time.sleep(0.001)
+        return memoryview(self._rx_buf)[: self._rx_len]
 
     def _send_and_receive(
         self, command: int, data: int = None, address: int = None
-    ) -> bytes:
-        frame = self._build_frame(command, address, data)
-        self.uart.reset_input_buffer()  # clear input before writing
-        self.uart.write(frame)
-        frame = self._read_frame()
+    ) -> memoryview:
+        """
+        Send a command and return the data from the reply
+
+        :param int command: Command to send
+        :param data: Optional data byte or sequence for the command
+        :param int address: address to send to, default is `address`
+        :return: the reply payload, only valid until the next frame is read
+        """
+        self._write_frame(self._get_frame(command, address, data))
+        length = self._REPLY_LEN.get(command)
+        # one deadline for the reply, however many stray readings come first
+        timeout_due = time.monotonic() + self.timeout
+        frame = self._read_frame(length, timeout_due)
+        # readings may still be arriving if continuous measuring is being stopped
+        measuring = self.CONTINUOUS_MEASURE
+        while command != measuring and frame[2] == measuring:
+            frame = self._read_frame(length, timeout_due)
         read_data = self._process_frame(address, command, frame)
         return read_data
 
@@ -247,7 +415,9 @@ class Laser(_LaserBase):
         :param bool value: If ``True``, turn on beeps, turn off if ``False``
         :return:
         """
-        self._send_command_and_raise_on_failure(self.BUZZER_CONTROL, int(value))
+        self._send_command_and_raise_on_failure(
+            self.BUZZER_CONTROL, 0x01 if value else 0x00
+        )
 
     def set_slave_address(self, address):
         """
@@ -279,6 +449,42 @@ class Laser(_LaserBase):
         result = self._check_measurement_for_errors(result)
         return result
 
+    def measure_continuous(self, count: int = 1) -> Iterator[int]:
+        """
+        Make a series of readings in continuous mode. Only one command is sent to start
+        measuring, so this is quicker than calling `measure` repeatedly. Measuring is
+        stopped once ``count`` readings have been made. If you stop iterating early,
+        call the generator's ``close()`` method (or `stop_measuring`), otherwise the
+        laser will keep measuring.
+
+        :param int count: number of readings to make
+        :return: generator yielding each distance in mm
+        :raises: Same as `measure`
+        """
+        self._write_frame(self._get_frame(self.CONTINUOUS_MEASURE))
+        try:
+            for _ in range(count):
+                frame = self._read_frame()
+                result = self._process_frame(None, self.CONTINUOUS_MEASURE, frame)
+                yield self._check_measurement_for_errors(result)
+        finally:
+            self.stop_measuring()
+
+    def measure_many(self, count: int) -> List[int]:
+        """
+        Make several readings in continuous mode and return them together, e.g. for
+        averaging. Only one command is sent to start measuring, rather than one per
+        reading as with `measure`
+
+        :param int count: number of readings to make
+        :return: list of distances in mm
+        :raises: Same as `measure`
+        """
+        results = [0] * count
+        for i, distance in enumerate(self.measure_continuous(count)):
+            results[i] = distance
+        return results
+
     @property
     def distance(self) -> float:
         """
@@ -303,26 +509,65 @@ class AsyncLaser(_LaserBase):
         super().__init__(uart, address, timeout)
         self.async_reader = asyncio.StreamReader(uart)
 
-    async def _read_frame(self):
-        buffer = b"\x00"
-        while buffer[0] != self.FRAME_START:
-            buffer = await self.async_reader.read(1) or b""
-        while buffer[-1] != self.FRAME_END:
-            buffer += await self.async_reader.read(1) or b""
-        return buffer
+    async def _read_frame(self, length: int = None) -> memoryview:
+        # pylint: disable=import-outside-toplevel
+        import asyncio
 
-    async def _send_and_receive(
-        self, command: int, data: int = None, address: int = None
-    ) -> bytes:
+        uart = self.uart
+        read = self.async_reader.read
+        readexactly = self.async_reader.readexactly
+        add_to_frame = self._add_to_frame
+        min_length = self._MIN_REPLY_LENGTH
+        chunk = self._start_frame()
+        while not add_to_frame(chunk):
+            # every reply has at least one data byte, so read the shortest possible
+            # frame (or the expected length) in one go, then pick up anything
+            # longer in chunks
+            missing = (length or min_length) - self._rx_len
+            if not self._rx_len:
+                chunk = await read(uart.in_waiting or 1) or b""
+            elif missing > 0:
+                chunk = await readexactly(missing)
+            else:
+                chunk = await read(uart.in_waiting or 8) or b""
+            if not chunk:
+                # reader may return nothing rather than waiting for data, so
+                # give the UART time to receive some instead of spinning
+                await asyncio.sleep(0.001)
+        return memoryview(self._rx_buf)[: self._rx_len]
+
+    async def _read_reply(self, command: int) -> memoryview:
+        length = self._REPLY_LEN.get(command)
+        frame = await self._read_frame(length)
+        # readings may still be arriving if continuous measuring is being stopped
+        measuring = self.CONTINUOUS_MEASURE
+        while command != measuring and frame[2] == measuring:
+            frame = await self._read_frame(length)
+        return frame
+
+    async def _wait_for_frame(self, reader) -> memoryview:
         # pylint: disable=import-outside-toplevel
         import asyncio
 
-        frame = self._build_frame(command, address, data)
-        self.uart.write(frame)
         try:
-            frame = await asyncio.wait_for(self._read_frame(), self.timeout)
+            return await asyncio.wait_for(reader, self.timeout)
         except asyncio.TimeoutError as exc:
             raise LaserTimeOutError("Did not receive response within timeout") from exc
+
+    async def _send_and_receive(
+        self, command: int, data: int = None, address: int = None
+    ) -> memoryview:
+        """
+        Send a command and return the data from the reply
+
+        :param int command: Command to send
+        :param data: Optional data byte or sequence for the command
+        :param int address: address to send to, default is `address`
+        :return: the reply payload, only valid until the next frame is read
+        """
+        self._write_frame(self._get_frame(command, address, data))
+        # one timeout for the reply, however many stray readings come first
+        frame = await self._wait_for_frame(self._read_reply(command))
         read_data = self._process_frame(address, command, frame)
         return read_data
 
@@ -362,7 +607,9 @@ class AsyncLaser(_LaserBase):
         :param bool value: If ``True``, turn on beeps, turn off if ``False``
         :return:
         """
-        await self._send_command_and_raise_on_failure(self.BUZZER_CONTROL, int(value))
+        await self._send_command_and_raise_on_failure(
+            self.BUZZER_CONTROL, 0x01 if value else 0x00
+        )
 
     async def set_slave_address(self, address):
         """
@@ -393,3 +640,25 @@ class AsyncLaser(_LaserBase):
         result = await self._send_and_receive(self.SINGLE_MEASURE)
         result = self._check_measurement_for_errors(result)
         return result
+
+    async def measure_many(self, count: int) -> List[int]:
+        """
+        Make several readings in continuous mode and return them together, e.g. for
+        averaging. Only one command is sent to start measuring, rather than one per
+        reading as with `measure`. CircuitPython does not support asynchronous
+        generators, so there is no equivalent of `Laser.measure_continuous`
+
+        :param int count: number of readings to make
+        :return: list of distances in mm
+        :raises: Same as `measure`
+        """
+        results = [0] * count
+        self._write_frame(self._get_frame(self.CONTINUOUS_MEASURE))
+        try:
+            for i in range(count):
+                frame = await self._wait_for_frame(self._read_frame())
+                result = self._process_frame(None, self.CONTINUOUS_MEASURE, frame)
+                results[i] = self._check_measurement_for_errors(result)
+        finally:
+            await self.stop_measuring()
+        return results